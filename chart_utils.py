@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+グラフ作成の共通処理
+"""
+
+from typing import Tuple
+import numpy as np
+
+# PNG出力の解像度（画面・資料での閲覧に十分な値）
+DEFAULT_CHART_DPI = 150
+
+# 保存できる画像形式（SVGはベクター形式のためdpiの影響を受けない）
+CHART_FORMATS = ('png', 'svg', 'webp')
+
+# 折れ線グラフに描画する点数の上限（これを超える場合はLTTBで間引く）
+DEFAULT_MAX_LINE_POINTS = 1000
+
+def save_figure(fig, path_stem: str, dpi: int = DEFAULT_CHART_DPI, image_format: str = 'png', **kwargs) -> str:
+    """
+    グラフを指定した形式で保存し、保存先のパス（拡張子付き）を返す
+    bbox_inches='tight' は再描画が1回増えるため、必要な呼び出し側でのみ kwargs で指定する
+    """
+    path = f"{path_stem}.{image_format}"
+    fig.savefig(path, dpi=dpi, format=image_format, **kwargs)
+    return path
+
+def lttb_downsample(x, y, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets法で系列を n_out 点に間引く（両端の点は必ず残す）
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    
+    # 面積計算用に数値化（日付はエポックからの値として扱う）
+    x_num = x.view('i8') if np.issubdtype(x.dtype, np.datetime64) else x
+    x_num = x_num.astype(np.float64)
+    y_num = y.astype(np.float64)
+    
+    # 両端を除いた点を n_out - 2 個のバケットに分割
+    buckets = np.array_split(np.arange(1, n - 1), n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    prev = 0
+    for i, bucket in enumerate(buckets):
+        # 次のバケットの平均点（最後のバケットでは終点）
+        next_bucket = buckets[i + 1] if i + 1 < len(buckets) else selected[-1:]
+        next_x = x_num[next_bucket].mean()
+        next_y = y_num[next_bucket].mean()
+        
+        # 前に選んだ点・次のバケット平均と作る三角形の面積が最大の点を選ぶ
+        area = np.abs((x_num[prev] - next_x) * (y_num[bucket] - y_num[prev])
+                      - (x_num[prev] - x_num[bucket]) * (next_y - y_num[prev]))
+        prev = bucket[np.argmax(area)]
+        selected[i + 1] = prev
+    
+    return x[selected], y[selected]
+
+def centered_moving_average(values, window: int) -> np.ndarray:
+    """
+    中央揃えの移動平均を累積和から計算（rolling(window, center=True).mean() と同じ位置合わせで、両端はNaN）
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) < window:
+        return result
+    
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    start = window // 2
+    result[start:start + len(values) - window + 1] = (csum[window:] - csum[:-window]) / window
+    return result
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+JSON読み書きの共通処理
+orjsonがインストールされていれば使用し、なければ標準のjsonにフォールバックする
+"""
+
+import gzip
+import json
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# .gz ファイルの圧縮レベル（書き込み速度を優先）
+GZIP_COMPRESS_LEVEL = 3
+
+# どちらの実装でも同じ例外で捕捉できるようにする（orjson.JSONDecodeErrorはこのサブクラス）
+JSONDecodeError = json.JSONDecodeError
+
+def loads(data) -> Any:
+    """
+    JSON文字列（bytes/str）をパース
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(data: Any) -> bytes:
+    """
+    データをコンパクトなJSON（UTF-8バイト列）に変換
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def open_binary(filepath: str, mode: str):
+    """
+    ファイルをバイナリモードで開く（拡張子が .gz ならgzip圧縮として扱う）
+    """
+    if str(filepath).endswith('.gz'):
+        return gzip.open(filepath, mode, compresslevel=GZIP_COMPRESS_LEVEL)
+    return open(filepath, mode)
+
+def load_file(filepath: str) -> Any:
+    """
+    JSONファイルを読み込む（.gz にも対応）
+    """
+    with open_binary(filepath, 'rb') as f:
+        return loads(f.read())
+
+def dump_file(data: Any, filepath: str):
+    """
+    データをJSONファイルとして保存（UTF-8、非ASCII文字はそのまま）
+    通常はインデント付き、.gz の場合は圧縮前提のためコンパクトに出力
+    """
+    compact = str(filepath).endswith('.gz')
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        content = orjson.dumps(data, option=option)
+    elif compact:
+        content = dumps(data)
+    else:
+        content = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    with open_binary(filepath, 'wb') as f:
+        f.write(content)
+
+def dump_lines(records: Iterable[Any], filepath: str):
+    """
+    レコードを1行1件のJSON Lines形式で逐次保存
+    """
+    with open_binary(filepath, 'wb') as f:
+        for record in records:
+            f.write(dumps(record))
+            f.write(b"\n")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+"""
+GitHub APIアクセスの共通処理（認証トークンの取得・レート制限への対応）
+"""
+
+import subprocess
+import os
+import asyncio
+import time
+from typing import Tuple
+import aiohttp
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_URL}/graphql"
+
+# レート制限の設定（残りリクエスト数が上限のこの割合を下回ったら、リセットまでの時間に分散して送信する）
+# 検索APIは1分あたり30回、その他は1時間あたり5000回と上限が異なるため、件数ではなく割合で判定する
+RATE_LIMIT_LOW_FRACTION = 0.1
+MAX_BACKOFF_SECONDS = 15
+MAX_RATE_LIMIT_RETRIES = 5
+
+def get_github_token() -> str:
+    """
+    GitHubトークンを取得（環境変数 → gh auth token の順）
+    """
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if token:
+        return token
+    
+    try:
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+def is_rate_limited(response: aiohttp.ClientResponse) -> bool:
+    """
+    レート制限による拒否かどうか（権限エラーなど他の403は再試行しない）
+    """
+    if response.status not in (403, 429):
+        return False
+    return "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+
+def get_rate_limit_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    """
+    レスポンスのレート制限ヘッダーから待機秒数を決定（待機不要なら0）
+    """
+    headers = response.headers
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        return float(retry_after)
+    
+    remaining = headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return 0
+    remaining = int(remaining)
+    limit = int(headers.get("X-RateLimit-Limit", 0))
+    if remaining > 0 and remaining >= limit * RATE_LIMIT_LOW_FRACTION:
+        return 0
+    
+    reset = headers.get("X-RateLimit-Reset")
+    if reset is None:
+        # リセット時刻が不明な場合は1秒から始まる指数バックオフ（上限あり）
+        return min(2 ** attempt, MAX_BACKOFF_SECONDS)
+    
+    # 使い切った場合はリセットまで待機し、残りわずかな場合は残りのリクエストをリセットまでの時間に分散する
+    until_reset = max(int(reset) - time.time(), 0) + 1
+    return until_reset if remaining == 0 else until_reset / (remaining + 1)
+
+async def request_with_rate_limit(session: aiohttp.ClientSession, method: str, url: str,
+                                  label: str, **kwargs) -> Tuple[aiohttp.ClientResponse, bytes]:
+    """
+    レート制限ヘッダーに従って待機しながらリクエストを送信し、レスポンスと本文を返す
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        async with session.request(method, url, **kwargs) as response:
+            content = await response.read()
+        rate_limited = is_rate_limited(response)
+        if rate_limited and attempt == MAX_RATE_LIMIT_RETRIES:
+            break
+        
+        # レート制限以外のエラーは呼び出し側で打ち切るため待機しない
+        delay = get_rate_limit_delay(response, attempt) if rate_limited or response.status < 400 else 0
+        if not delay:
+            break
+        
+        print(f"Rate limit {'reached' if rate_limited else 'low'}, waiting {delay:.1f}s ({label})")
+        await asyncio.sleep(delay)
+        
+        # レート制限で拒否された場合のみ再試行
+        if not rate_limited:
+            break
+    
+    return response, content
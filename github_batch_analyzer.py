@@ -1,20 +1,126 @@
 #!/usr/bin/env python3
 
-import subprocess
-import json
+import asyncio
+import sqlite3
+import time
 import argparse
+import heapq
 import sys
-import time
 from datetime import datetime
-from typing import Dict, List
-import concurrent.futures
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple, TypedDict
 from pathlib import Path
+import aiohttp
+import numpy as np
+import fast_json
+from github_api import GITHUB_GRAPHQL_URL, get_github_token, request_with_rate_limit
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# 全リクエスト共通のHTTPヘッダー（Authorizationはmain()で設定）
+_headers = {"Accept": "application/vnd.github+json"}
+
+# レスポンスキャッシュ（過去の年は変化しないため無期限、それ以外は1時間）
+DEFAULT_CACHE_PATH = ".gh_contrib_cache.sqlite3"
+CACHE_TTL_SECONDS = 3600
+
+# 全体統計に保持するトップコントリビューターの人数
+TOP_CONTRIBUTORS_LIMIT = 20
+
+# 1回のGraphQLクエリで取得するユーザー数
+DEFAULT_QUERY_BATCH_SIZE = 10
+
+# ユーザーごとに取得するフィールド
+USER_CONTRIBUTIONS_FRAGMENT = '''
+fragment UserContributions on User {
+  name
+  login
+  contributionsCollection(from: $from, to: $to) {
+    totalCommitContributions
+    totalIssueContributions
+    totalPullRequestContributions
+    totalPullRequestReviewContributions
+    contributionCalendar {
+      totalContributions
+      weeks {
+        contributionDays {
+          date
+          contributionCount
+        }
+      }
+    }
+  }
+}
+'''
+
+# GraphQLレスポンスのスキーマ（分析で使うフィールドのみ。未使用フィールドはデコード時に読み飛ばす）
+class ContributionDay(TypedDict):
+    date: str
+    contributionCount: int
+
+class ContributionWeek(TypedDict):
+    contributionDays: List[ContributionDay]
+
+class ContributionCalendar(TypedDict):
+    totalContributions: int
+    weeks: List[ContributionWeek]
+
+class ContributionsCollection(TypedDict):
+    totalCommitContributions: int
+    totalIssueContributions: int
+    totalPullRequestContributions: int
+    totalPullRequestReviewContributions: int
+    contributionCalendar: ContributionCalendar
+
+class GitHubUser(TypedDict):
+    name: Optional[str]
+    login: str
+    contributionsCollection: ContributionsCollection
+
+class GraphQLResponse(TypedDict, total=False):
+    data: Optional[Dict[str, Optional[GitHubUser]]]  # エイリアス（u0, u1, ...）→ ユーザー
+
+if msgspec is not None:
+    _response_decoder = msgspec.json.Decoder(GraphQLResponse)
+    _user_decoder = msgspec.json.Decoder(GitHubUser)
+    DECODE_ERRORS = (fast_json.JSONDecodeError, msgspec.DecodeError)
+else:
+    _response_decoder = None
+    _user_decoder = None
+    DECODE_ERRORS = (fast_json.JSONDecodeError,)
 
-def get_user_contributions(username: str, year: int = None) -> Dict:
+def decode_graphql_response(content: bytes) -> Dict:
     """
-    指定したユーザーのコントリビューションデータを取得
+    GraphQLレスポンスをデコード（msgspecがあればスキーマ付きで高速にデコード）
     """
-    print(f"Fetching contribution data for user: {username}")
+    if _response_decoder is not None:
+        return _response_decoder.decode(content)
+    return fast_json.loads(content)
+
+def decode_user_contributions(content: bytes) -> Dict:
+    """
+    キャッシュしたユーザー単位のJSONをデコード（レスポンスと同じスキーマを適用）
+    """
+    if _user_decoder is not None:
+        return _user_decoder.decode(content)
+    return fast_json.loads(content)
+
+def build_batch_query(user_count: int) -> str:
+    """
+    複数ユーザーをエイリアス（u0, u1, ...）でまとめて取得するGraphQLクエリを作成
+    """
+    params = "".join(f"$u{i}: String!, " for i in range(user_count))
+    fields = "\n".join(f"  u{i}: user(login: $u{i}) {{ ...UserContributions }}" for i in range(user_count))
+    return f"query({params}$from: DateTime, $to: DateTime) {{\n{fields}\n}}\n{USER_CONTRIBUTIONS_FRAGMENT}"
+
+async def get_users_contributions(session: aiohttp.ClientSession, usernames: List[str], year: int = None) -> Dict[str, Dict]:
+    """
+    複数ユーザーのコントリビューションデータを1回のリクエストで取得
+    """
+    print(f"Fetching contribution data for users: {', '.join(usernames)}")
     
     # 年指定がある場合のクエリ調整
     from_date = ""
@@ -23,60 +129,43 @@ def get_user_contributions(username: str, year: int = None) -> Dict:
         from_date = f'{year}-01-01T00:00:00Z'
         to_date = f'{year}-12-31T23:59:59Z'
     
-    # GraphQLクエリ
-    query = '''
-    query($username: String!, $from: DateTime, $to: DateTime) {
-      user(login: $username) {
-        name
-        login
-        contributionsCollection(from: $from, to: $to) {
-          totalCommitContributions
-          totalIssueContributions
-          totalPullRequestContributions
-          totalPullRequestReviewContributions
-          contributionCalendar {
-            totalContributions
-            weeks {
-              contributionDays {
-                date
-                contributionCount
-                color
-              }
-            }
-          }
-        }
-      }
-    }
-    '''
+    query = build_batch_query(len(usernames))
+    variables = {f"u{i}": username for i, username in enumerate(usernames)}
+    if from_date and to_date:
+        variables.update({"from": from_date, "to": to_date})
     
     try:
-        cmd = ["gh", "api", "graphql", "-f", f"query={query}", "-f", f"username={username}"]
-        if from_date and to_date:
-            cmd.extend(["-f", f"from={from_date}", "-f", f"to={to_date}"])
+        response, content = await request_with_rate_limit(
+            session, "POST", GITHUB_GRAPHQL_URL, f"{usernames[0]}...",
+            json={"query": query, "variables": variables})
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
+        response.raise_for_status()
+        data = decode_graphql_response(content).get("data") or {}
         
-        if data.get("data", {}).get("user") is None:
+    except DECODE_ERRORS as e:
+        print(f"JSON decode error for {', '.join(usernames)}: {e}")
+        return {}
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error fetching contribution data for {', '.join(usernames)}: {e}")
+        return {}
+    
+    # エイリアスからユーザー名に戻す
+    results = {}
+    for i, username in enumerate(usernames):
+        user = data.get(f"u{i}")
+        if user is None:
             print(f"User '{username}' not found")
-            return None
-        
-        return data["data"]["user"]
-        
-    except subprocess.CalledProcessError as e:
-        print(f"Error fetching contribution data for {username}: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error for {username}: {e}")
-        return None
+            continue
+        results[username] = user
+    
+    return results
 
 def load_users_from_file(filepath: str) -> List[str]:
     """
     JSONファイルからユーザーリストを読み込む
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = fast_json.load_file(filepath)
         
         # ユーザー検索結果ファイルからユーザー名を抽出
         if isinstance(data, list) and len(data) > 0:
@@ -90,38 +179,109 @@ def load_users_from_file(filepath: str) -> List[str]:
         print(f"Error loading users from {filepath}: {e}")
         return []
 
-def fetch_contributions_batch(usernames: List[str], year: int = None, max_workers: int = 5) -> Dict[str, Dict]:
+def open_contributions_cache(cache_path: str) -> sqlite3.Connection:
     """
-    複数ユーザーのコントリビューションデータを並列取得
+    コントリビューションデータのキャッシュDBを開く
+    """
+    conn = sqlite3.connect(cache_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS contributions (
+            username TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            expires_at REAL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (username, year)
+        )
+    """)
+    return conn
+
+def load_cached_contributions(conn: sqlite3.Connection, usernames: List[str], year: int = None) -> Dict[str, Dict]:
+    """
+    有効期限内のキャッシュからコントリビューションデータを読み込む
+    """
+    cached = {}
+    now = time.time()
+    for username in usernames:
+        row = conn.execute(
+            "SELECT data FROM contributions WHERE username = ? AND year = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (username, year or 0, now)
+        ).fetchone()
+        if row:
+            try:
+                cached[username] = decode_user_contributions(row[0])
+            except DECODE_ERRORS:
+                # 壊れた・古い形式のエントリは再取得する
+                continue
+    return cached
+
+def save_cached_contributions(conn: sqlite3.Connection, results: Dict[str, Dict], year: int = None):
+    """
+    取得したコントリビューションデータをキャッシュに保存
+    """
+    # 過去の年のデータは確定しているので期限なし
+    if year and year < datetime.now().year:
+        expires_at = None
+    else:
+        expires_at = time.time() + CACHE_TTL_SECONDS
+    
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO contributions (username, year, expires_at, data) VALUES (?, ?, ?, ?)",
+            [(username, year or 0, expires_at, fast_json.dumps(user)) for username, user in results.items()]
+        )
+
+async def fetch_contributions_batch(usernames: List[str], year: int = None, max_workers: int = 5,
+                                    batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+                                    cache_path: str = None) -> Dict[str, Dict]:
+    """
+    複数ユーザーのコントリビューションデータを並列取得（cache_path指定時はキャッシュを利用）
     """
     print(f"Fetching contributions for {len(usernames)} users...")
     
     results = {}
-    failed_users = []
-    
-    # レート制限を考慮して並列数を制限
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # タスクを投入
-        future_to_username = {
-            executor.submit(get_user_contributions, username, year): username 
-            for username in usernames
-        }
-        
-        for future in concurrent.futures.as_completed(future_to_username):
-            username = future_to_username[future]
+    cache = None
+    pending = usernames
+    
+    if cache_path:
+        cache = open_contributions_cache(cache_path)
+        results.update(load_cached_contributions(cache, usernames, year))
+        pending = [username for username in usernames if username not in results]
+        if results:
+            print(f"Cache hit: {len(results)} users (fetching {len(pending)})")
+    
+    # batch_size人ずつ1つのクエリにまとめる
+    chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    
+    # レート制限を考慮して同時リクエスト数を制限
+    semaphore = asyncio.Semaphore(max_workers)
+    
+    async def fetch_chunk(session: aiohttp.ClientSession, chunk: List[str]) -> Dict[str, Dict]:
+        async with semaphore:
             try:
-                result = future.result()
-                if result:
-                    results[username] = result
-                else:
-                    failed_users.append(username)
-                
-                # API rate limitを避けるため間隔を空ける
-                time.sleep(0.2)
-                
+                return await get_users_contributions(session, chunk, year)
             except Exception as e:
-                print(f"Error processing {username}: {e}")
-                failed_users.append(username)
+                print(f"Error processing {', '.join(chunk)}: {e}")
+                return {}
+    
+    connector = aiohttp.TCPConnector(limit=max_workers)
+    timeout = aiohttp.ClientTimeout(total=60)
+    try:
+        async with aiohttp.ClientSession(headers=_headers, connector=connector, timeout=timeout) as session:
+            tasks = [fetch_chunk(session, chunk) for chunk in chunks]
+            
+            # 完了したチャンクから順に反映（途中で中断してもキャッシュ済みの分は再利用できる）
+            for completed in asyncio.as_completed(tasks):
+                result = await completed
+                results.update(result)
+                if cache is not None and result:
+                    save_cached_contributions(cache, result, year)
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    # 入力順を維持
+    results = {username: results[username] for username in usernames if username in results}
+    failed_users = [username for username in usernames if username not in results]
     
     print(f"Successfully fetched: {len(results)} users")
     if failed_users:
@@ -129,6 +289,36 @@ def fetch_contributions_batch(usernames: List[str], year: int = None, max_worker
     
     return results
 
+def aggregate_daily_counts(dates: List[str], counts: List[int]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    日付ごと・月ごとのコントリビューション合計を計算
+    """
+    if not dates:
+        return {}, {}
+    
+    days = np.array(dates, dtype='datetime64[D]')
+    values = np.array(counts, dtype=np.int64)
+    
+    # 最初の日付からの日数をインデックスとして加算
+    # （bincountの重みはfloat64だが、2**53未満の整数和は正確に表現できる）
+    start = days.min()
+    day_index = (days - start).astype(np.int64)
+    daily_totals = np.bincount(day_index, weights=values).astype(np.int64)
+    
+    # データが存在する日付のみを残す
+    present = np.bincount(day_index, minlength=len(daily_totals)) > 0
+    present_days = start + np.flatnonzero(present)
+    daily_totals = daily_totals[present]
+    
+    # 月別集計（日付は昇順なので月の境界でreduceat）
+    months = present_days.astype('datetime64[M]')
+    month_starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    monthly_totals = np.add.reduceat(daily_totals, month_starts)
+    
+    daily_aggregate = dict(zip(np.datetime_as_string(present_days).tolist(), daily_totals.tolist()))
+    monthly_aggregate = dict(zip(np.datetime_as_string(months[month_starts]).tolist(), monthly_totals.tolist()))
+    return daily_aggregate, monthly_aggregate
+
 def analyze_batch_contributions(batch_data: Dict[str, Dict]) -> Dict:
     """
     バッチ取得したコントリビューションデータを分析
@@ -149,6 +339,14 @@ def analyze_batch_contributions(batch_data: Dict[str, Dict]) -> Dict:
         "monthly_aggregate": {}
     }
     
+    intern = sys.intern
+    
+    # 全ユーザーの日別データ（フラット化）
+    all_dates = []
+    all_counts = []
+    # 全員が活動なしの場合でも日付の範囲を残すため、最初の活動なしユーザーのカレンダーを保持
+    inactive_calendar = None
+    
     for username, user_data in batch_data.items():
         contrib_collection = user_data["contributionsCollection"]
         calendar = contrib_collection["contributionCalendar"]
@@ -165,25 +363,6 @@ def analyze_batch_contributions(batch_data: Dict[str, Dict]) -> Dict:
             "daily_contributions": {}
         }
         
-        # 日別データの処理
-        for week in calendar["weeks"]:
-            for day in week["contributionDays"]:
-                date = day["date"]
-                count = day["contributionCount"]
-                
-                user_stats["daily_contributions"][date] = count
-                
-                # 全体統計に加算
-                if date not in aggregate_stats["daily_aggregate"]:
-                    aggregate_stats["daily_aggregate"][date] = 0
-                aggregate_stats["daily_aggregate"][date] += count
-                
-                # 月別統計
-                month_key = date[:7]  # YYYY-MM
-                if month_key not in aggregate_stats["monthly_aggregate"]:
-                    aggregate_stats["monthly_aggregate"][month_key] = 0
-                aggregate_stats["monthly_aggregate"][month_key] += count
-        
         users_stats[username] = user_stats
         
         # 全体統計に加算
@@ -193,15 +372,38 @@ def analyze_batch_contributions(batch_data: Dict[str, Dict]) -> Dict:
         aggregate_stats["total_prs"] += user_stats["total_prs"]
         aggregate_stats["total_reviews"] += user_stats["total_reviews"]
         
-        if user_stats["total_contributions"] > 0:
-            aggregate_stats["active_users"] += 1
-    
-    # トップコントリビューター
-    aggregate_stats["top_contributors"] = sorted(
-        [{"username": u["username"], "name": u["name"], "contributions": u["total_contributions"]} 
-         for u in users_stats.values()],
-        key=lambda x: x["contributions"],
-        reverse=True
+        # 活動のないユーザーは日別データの処理を省略（合計に影響しない）
+        if user_stats["total_contributions"] == 0:
+            if inactive_calendar is None:
+                inactive_calendar = calendar
+            continue
+        aggregate_stats["active_users"] += 1
+        
+        # 日別データの処理（集計はループ後にまとめてベクトル化）
+        days = [day for week in calendar["weeks"] for day in week["contributionDays"]]
+        # 同じ日付文字列が全ユーザーで繰り返されるため、internして1つのオブジェクトを共有する
+        dates = [intern(day["date"]) for day in days]
+        counts = [day["contributionCount"] for day in days]
+        user_stats["daily_contributions"] = dict(zip(dates, counts))
+        all_dates.extend(dates)
+        all_counts.extend(counts)
+    
+    # 全員が活動なしの場合は、カレンダーの日付を0件として集計する（グラフで0の線を描けるように）
+    if not all_dates and inactive_calendar is not None:
+        all_dates = [day["date"] for week in inactive_calendar["weeks"] for day in week["contributionDays"]]
+        all_counts = [0] * len(all_dates)
+    
+    # 日別・月別の全ユーザー合計
+    daily_aggregate, monthly_aggregate = aggregate_daily_counts(all_dates, all_counts)
+    aggregate_stats["daily_aggregate"] = daily_aggregate
+    aggregate_stats["monthly_aggregate"] = monthly_aggregate
+    
+    # トップコントリビューター（上位のみ。同数の場合は元の順序を維持）
+    aggregate_stats["top_contributors"] = heapq.nlargest(
+        TOP_CONTRIBUTORS_LIMIT,
+        ({"username": u["username"], "name": u["name"], "contributions": u["total_contributions"]}
+         for u in users_stats.values()),
+        key=itemgetter("contributions")
     )
     
     return {
@@ -212,39 +414,38 @@ def analyze_batch_contributions(batch_data: Dict[str, Dict]) -> Dict:
 
 def create_visualization_data(analysis_data: Dict) -> Dict:
     """
-    グラフ化用のデータ構造を作成
+    グラフ化用のデータ構造を作成（列ごとの配列を持つカラム形式）
     """
     aggregate_stats = analysis_data["aggregate_stats"]
     users_stats = analysis_data["users_stats"]
     
     # 日別の合計グラフ用データ
-    daily_data = []
-    for date, total in sorted(aggregate_stats["daily_aggregate"].items()):
-        daily_data.append({
-            "date": date,
-            "total_contributions": total
-        })
+    daily_aggregate = aggregate_stats["daily_aggregate"]
+    daily_dates = sorted(daily_aggregate)
+    daily_data = {
+        "date": daily_dates,
+        "total_contributions": [daily_aggregate[date] for date in daily_dates]
+    }
     
     # 月別の合計グラフ用データ
-    monthly_data = []
-    for month, total in sorted(aggregate_stats["monthly_aggregate"].items()):
-        monthly_data.append({
-            "month": month,
-            "total_contributions": total
-        })
-    
-    # ユーザー別比較データ
-    user_comparison = []
-    for user_data in users_stats.values():
-        user_comparison.append({
-            "username": user_data["username"],
-            "name": user_data["name"],
-            "total_contributions": user_data["total_contributions"],
-            "commits": user_data["total_commits"],
-            "issues": user_data["total_issues"],
-            "prs": user_data["total_prs"],
-            "reviews": user_data["total_reviews"]
-        })
+    monthly_aggregate = aggregate_stats["monthly_aggregate"]
+    months = sorted(monthly_aggregate)
+    monthly_data = {
+        "month": months,
+        "total_contributions": [monthly_aggregate[month] for month in months]
+    }
+    
+    # ユーザー別比較データ（コントリビューション数の降順）
+    users = sorted(users_stats.values(), key=itemgetter("total_contributions"), reverse=True)
+    user_comparison = {
+        "username": [u["username"] for u in users],
+        "name": [u["name"] for u in users],
+        "total_contributions": [u["total_contributions"] for u in users],
+        "commits": [u["total_commits"] for u in users],
+        "issues": [u["total_issues"] for u in users],
+        "prs": [u["total_prs"] for u in users],
+        "reviews": [u["total_reviews"] for u in users]
+    }
     
     # 上位ユーザーのトレンド比較用データ
     top_users = aggregate_stats["top_contributors"][:10]  # 上位10ユーザー
@@ -252,44 +453,59 @@ def create_visualization_data(analysis_data: Dict) -> Dict:
     
     for user in top_users:
         username = user["username"]
-        if username in users_stats:
-            trend_data[username] = []
+        # 活動のないユーザーはトレンドに含めない
+        if username in users_stats and user["contributions"] > 0:
             daily_contrib = users_stats[username]["daily_contributions"]
-            for date in sorted(daily_contrib.keys()):
-                trend_data[username].append({
-                    "date": date,
-                    "contributions": daily_contrib[date]
-                })
+            dates = sorted(daily_contrib)
+            trend_data[username] = {
+                "date": dates,
+                "contributions": [daily_contrib[date] for date in dates]
+            }
     
     return {
         "daily_aggregate": daily_data,
         "monthly_aggregate": monthly_data,
-        "user_comparison": sorted(user_comparison, key=lambda x: x["total_contributions"], reverse=True),
+        "user_comparison": user_comparison,
         "top_users_trend": trend_data
     }
 
-def save_analysis_results(analysis_data: Dict, viz_data: Dict, output_prefix: str):
+def iter_full_analysis_lines(analysis_data: Dict):
+    """
+    完全な分析データをJSON Lines用のレコードに分割（1行目は全体統計、以降は1ユーザー1行）
+    """
+    yield {
+        "aggregate_stats": analysis_data["aggregate_stats"],
+        "analysis_date": analysis_data["analysis_date"]
+    }
+    for username, stats in analysis_data["users_stats"].items():
+        yield {"username": username, "stats": stats}
+
+def save_analysis_results(analysis_data: Dict, viz_data: Dict, output_prefix: str, output_format: str = 'json',
+                          compress: bool = True):
     """
-    分析結果を複数のファイルに保存
+    分析結果を複数のファイルに保存（完全な分析データはデフォルトでgzip圧縮）
     """
     # 完全な分析データ
-    with open(f"{output_prefix}_full_analysis.json", 'w', encoding='utf-8') as f:
-        json.dump(analysis_data, f, indent=2, ensure_ascii=False)
+    suffix = ".gz" if compress else ""
+    if output_format == 'jsonl':
+        full_analysis_file = f"{output_prefix}_full_analysis.jsonl{suffix}"
+        fast_json.dump_lines(iter_full_analysis_lines(analysis_data), full_analysis_file)
+    else:
+        full_analysis_file = f"{output_prefix}_full_analysis.json{suffix}"
+        fast_json.dump_file(analysis_data, full_analysis_file)
     
     # グラフ化用データ
-    with open(f"{output_prefix}_visualization_data.json", 'w', encoding='utf-8') as f:
-        json.dump(viz_data, f, indent=2, ensure_ascii=False)
+    fast_json.dump_file(viz_data, f"{output_prefix}_visualization_data.json")
     
     # サマリーレポート
     summary = {
         "summary": analysis_data["aggregate_stats"],
         "top_contributors": analysis_data["aggregate_stats"]["top_contributors"][:20]
     }
-    with open(f"{output_prefix}_summary.json", 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    fast_json.dump_file(summary, f"{output_prefix}_summary.json")
     
     print(f"Analysis results saved:")
-    print(f"  - {output_prefix}_full_analysis.json (Complete data)")
+    print(f"  - {full_analysis_file} (Complete data)")
     print(f"  - {output_prefix}_visualization_data.json (Chart data)")
     print(f"  - {output_prefix}_summary.json (Summary report)")
 
@@ -333,20 +549,30 @@ def main():
                        help='Output files prefix (default: batch_analysis)')
     parser.add_argument('--max-workers', type=int, default=3,
                        help='Maximum parallel workers (default: 3)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_QUERY_BATCH_SIZE,
+                       help=f'Users per GraphQL query (default: {DEFAULT_QUERY_BATCH_SIZE})')
+    parser.add_argument('--cache-file', default=DEFAULT_CACHE_PATH,
+                       help=f'Response cache file (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the response cache')
     parser.add_argument('--limit', type=int,
                        help='Limit number of users to process (for testing)')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                       help='Full analysis output format; jsonl writes one user per line (default: json)')
+    parser.add_argument('--no-compress', action='store_true',
+                       help='Write the full analysis uncompressed instead of gzip (.gz)')
     parser.add_argument('--summary-only', action='store_true',
                        help='Only show summary, do not save files')
     
     args = parser.parse_args()
     
-    # GitHub CLIがインストールされているかチェック
-    try:
-        subprocess.run(["gh", "--version"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
-        print("Error: GitHub CLI (gh) is not installed or not authenticated.")
-        print("Please install gh and run 'gh auth login' first.")
+    # GitHubトークンを確認
+    token = get_github_token()
+    if not token:
+        print("Error: GitHub token not found.")
+        print("Please set GITHUB_TOKEN or run 'gh auth login' first.")
         sys.exit(1)
+    _headers["Authorization"] = f"bearer {token}"
     
     # ユーザーリストを読み込み
     usernames = load_users_from_file(args.users_file)
@@ -361,7 +587,9 @@ def main():
     print(f"Processing {len(usernames)} users from {args.users_file}")
     
     # バッチでコントリビューションデータを取得
-    batch_data = fetch_contributions_batch(usernames, args.year, args.max_workers)
+    cache_path = None if args.no_cache else args.cache_file
+    batch_data = asyncio.run(fetch_contributions_batch(usernames, args.year, args.max_workers,
+                                                       args.batch_size, cache_path))
     
     if not batch_data:
         print("No contribution data was retrieved.")
@@ -378,7 +606,8 @@ def main():
     
     # ファイルに保存
     if not args.summary_only:
-        save_analysis_results(analysis_data, viz_data, args.output_prefix)
+        save_analysis_results(analysis_data, viz_data, args.output_prefix, args.format,
+                              not args.no_compress)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
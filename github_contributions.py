@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 
-import subprocess
-import json
 import argparse
 import sys
 from datetime import datetime
 from typing import Dict, List
+import pandas as pd
+import requests
+import fast_json
+from github_api import GITHUB_GRAPHQL_URL, get_github_token
+
+# 全リクエストで共有するHTTPセッション（TCP/TLS接続を再利用）
+_session = requests.Session()
+_session.headers.update({"Accept": "application/vnd.github+json"})
 
 def get_user_contributions(username: str, year: int = None) -> Dict:
     """
@@ -68,26 +74,32 @@ def get_user_contributions(username: str, year: int = None) -> Dict:
     }
     '''
     
+    variables = {"username": username}
+    if from_date and to_date:
+        variables.update({"from": from_date, "to": to_date})
+    
     try:
-        cmd = ["gh", "api", "graphql", "-f", f"query={query}", "-f", f"username={username}"]
-        if from_date and to_date:
-            cmd.extend(["-f", f"from={from_date}", "-f", f"to={to_date}"])
+        response = _session.post(GITHUB_GRAPHQL_URL,
+                                 json={"query": query, "variables": variables},
+                                 timeout=30)
+        response.raise_for_status()
+        data = fast_json.loads(response.content)
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
-        
-        if data.get("data", {}).get("user") is None:
+        if (data.get("data") or {}).get("user") is None:
             print(f"User '{username}' not found")
             return None
         
         return data["data"]["user"]
         
-    except subprocess.CalledProcessError as e:
+    except fast_json.JSONDecodeError as e:
+        print(f"JSON decode error: {e}")
+        return None
+    except requests.HTTPError as e:
         print(f"Error fetching contribution data: {e}")
-        print(f"stderr: {e.stderr}")
+        print(f"response: {e.response.text}")
         return None
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
+    except requests.RequestException as e:
+        print(f"Error fetching contribution data: {e}")
         return None
 
 def analyze_contributions(user_data: Dict) -> Dict:
@@ -117,38 +129,41 @@ def analyze_contributions(user_data: Dict) -> Dict:
         }
     }
     
-    # 日別データの分析
+    # 日別データの分析（ループ内の辞書参照を減らすためローカル変数に束縛）
     daily_contributions = []
-    max_contributions_day = {"date": "", "count": 0}
+    append_daily = daily_contributions.append
+    max_date = ""
+    max_count = 0
     active_days = 0
-    monthly_stats = {}
     
     for week in calendar["weeks"]:
         for day in week["contributionDays"]:
-            daily_data = {
-                "date": day["date"],
-                "count": day["contributionCount"],
+            date = day["date"]
+            count = day["contributionCount"]
+            append_daily({
+                "date": date,
+                "count": count,
                 "color": day["color"],
                 "weekday": day["weekday"]
-            }
-            daily_contributions.append(daily_data)
+            })
             
-            if day["contributionCount"] > 0:
+            if count > 0:
                 active_days += 1
-            
-            if day["contributionCount"] > max_contributions_day["count"]:
-                max_contributions_day = {
-                    "date": day["date"],
-                    "count": day["contributionCount"]
-                }
-            
-            # 月別統計
-            month_key = day["date"][:7]  # YYYY-MM
-            if month_key not in monthly_stats:
-                monthly_stats[month_key] = {"total": 0, "active_days": 0}
-            monthly_stats[month_key]["total"] += day["contributionCount"]
-            if day["contributionCount"] > 0:
-                monthly_stats[month_key]["active_days"] += 1
+                if count > max_count:
+                    max_date = date
+                    max_count = count
+    
+    max_contributions_day = {"date": max_date, "count": max_count}
+    
+    # 月別統計（YYYY-MM単位で集計）
+    daily_df = pd.DataFrame(daily_contributions, columns=["date", "count"])
+    daily_df["month"] = daily_df["date"].str.slice(0, 7)
+    daily_df["active"] = daily_df["count"] > 0
+    monthly_df = daily_df.groupby("month", sort=False).agg(
+        total=("count", "sum"),
+        active_days=("active", "sum")
+    )
+    monthly_stats = monthly_df.to_dict(orient="index")
     
     stats.update({
         "active_days": active_days,
@@ -175,8 +190,7 @@ def save_contributions_to_file(data: Dict, filename: str):
     """
     コントリビューションデータをJSONファイルに保存
     """
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    fast_json.dump_file(data, filename)
     print(f"Contribution data saved to {filename}")
 
 def print_contribution_summary(stats: Dict):
@@ -220,13 +234,13 @@ def main():
     
     args = parser.parse_args()
     
-    # GitHub CLIがインストールされているかチェック
-    try:
-        subprocess.run(["gh", "--version"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
-        print("Error: GitHub CLI (gh) is not installed or not authenticated.")
-        print("Please install gh and run 'gh auth login' first.")
+    # GitHubトークンを確認
+    token = get_github_token()
+    if not token:
+        print("Error: GitHub token not found.")
+        print("Please set GITHUB_TOKEN or run 'gh auth login' first.")
         sys.exit(1)
+    _session.headers["Authorization"] = f"bearer {token}"
     
     # データ取得
     user_data = get_user_contributions(args.username, args.year)
@@ -1,225 +1,297 @@
 #!/usr/bin/env python3
 
-import json
+from __future__ import annotations
+
 import argparse
 import sys
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.dates import DateFormatter, WeekdayLocator
-import pandas as pd
-import seaborn as sns
+from typing import TYPE_CHECKING
+import numpy as np
 from pathlib import Path
+import fast_json
+from chart_utils import DEFAULT_MAX_LINE_POINTS, centered_moving_average, lttb_downsample, save_figure
 
-# 日本語フォントの設定
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
+# pandas・matplotlib・seabornは読み込みが重いため、使用する関数内でimportする
+if TYPE_CHECKING:
+    import pandas as pd
+
+def setup_plotting():
+    """
+    描画ライブラリを読み込み、グラフのスタイルを設定
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # ファイル出力のみのため非対話バックエンドを使用
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    # 日本語フォントの設定
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    sns.set_style("whitegrid")
 
 def load_visualization_data(filepath: str) -> dict:
     """
     グラフ化用データを読み込む
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return fast_json.load_file(filepath)
     except Exception as e:
         print(f"Error loading visualization data: {e}")
         return None
 
-def create_weekly_group_trends(data: dict, output_path: str):
+def prepare_daily_frame(daily_data) -> pd.DataFrame:
     """
-    週次グループ全体のコントリビューショントレンドグラフを作成（完全な7日間の週のみ）
+    日別データをパースし、週の集計に必要な列を事前計算したデータフレームを作成
     """
-    daily_data = data["daily_aggregate"]
+    import pandas as pd
     
-    if not daily_data:
-        print("No daily data available for weekly charting")
-        return
-    
-    # データフレームに変換
+    # データフレームに変換（カラム形式・レコード形式のどちらにも対応）
     df = pd.DataFrame(daily_data)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
+    if df.empty:
+        return df
+    
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+    if not df['date'].is_monotonic_increasing:
+        # 日付配列のインデックスソートで行を並べ替える（sort_valuesより軽量）
+        df = df.iloc[np.argsort(df['date'].values, kind='stable')]
     
     # 週の開始日（月曜日）を計算
-    df['week_start'] = df['date'] - pd.to_timedelta(df['date'].dt.dayofweek, unit='d')
+    days = df['date'].values.astype('datetime64[D]')
+    day_of_week = (days.view('i8') + 3) % 7  # 1970-01-01は木曜日（月曜=0）
+    week_start = days - day_of_week.astype('timedelta64[D]')
+    df['week_start'] = week_start.astype('datetime64[ns]')
+    
+    # ヒートマップ用に年とISO週番号を追加
+    # ISO週番号は、その週の木曜日が属する年の1月1日から数える
+    thursday = week_start + np.timedelta64(3, 'D')
+    iso_year_start = thursday.astype('datetime64[Y]').astype('datetime64[D]')
+    df['year'] = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    df['week'] = (thursday - iso_year_start).astype(np.int64) // 7 + 1
+    
+    return df
+
+def aggregate_weekly(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    日別データを週（月曜始まり）ごとに集計し、合計と週内の日数を返す
+    """
+    import pandas as pd
+    
+    # 最初の週からの週番号をキーにしてbincountで集計
+    week_days = df['week_start'].values.astype('datetime64[D]').view('i8')
+    first_week = week_days.min()
+    week_index = (week_days - first_week) // 7
+    totals = np.bincount(week_index, weights=df['total_contributions'].to_numpy())
+    counts = np.bincount(week_index)
+    
+    # データが存在する週のみを残す
+    present = np.flatnonzero(counts)
+    week_starts = (first_week + 7 * present).astype('datetime64[D]').astype('datetime64[ns]')
+    return pd.DataFrame({
+        'week_start': week_starts,
+        'total_contributions': totals[present].astype(np.int64),
+        'days_in_week': counts[present]
+    })
+
+def create_weekly_group_trends(data: dict, output_path: str, df: pd.DataFrame = None,
+                               downsample: int = DEFAULT_MAX_LINE_POINTS):
+    """
+    週次グループ全体のコントリビューショントレンドグラフを作成（完全な7日間の週のみ）
+    """
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    from matplotlib.dates import DateFormatter
+    
+    if df is None:
+        df = prepare_daily_frame(data["daily_aggregate"])
+    
+    if df.empty:
+        print("No daily data available for weekly charting")
+        return
     
     # 週次集計（日数もカウント）
-    weekly_df = df.groupby('week_start').agg({
-        'total_contributions': 'sum',
-        'date': 'count'  # 各週の日数をカウント
-    }).reset_index()
-    weekly_df.rename(columns={'date': 'days_in_week'}, inplace=True)
+    weekly_df = aggregate_weekly(df)
     
-    # 完全な7日間の週のみを保持
-    complete_weeks = weekly_df[weekly_df['days_in_week'] == 7].copy()
+    # 完全な7日間の週のみを保持（データフレームを作らず各列の配列に同じマスクを適用）
+    complete = weekly_df['days_in_week'].to_numpy() == 7
+    week_starts = weekly_df['week_start'].to_numpy()[complete]
+    weekly_totals = weekly_df['total_contributions'].to_numpy()[complete]
     
     print(f"Total weeks found: {len(weekly_df)}")
-    print(f"Complete weeks (7 days): {len(complete_weeks)}")
-    print(f"Excluded incomplete weeks: {len(weekly_df) - len(complete_weeks)}")
+    print(f"Complete weeks (7 days): {len(weekly_totals)}")
+    print(f"Excluded incomplete weeks: {len(weekly_df) - len(weekly_totals)}")
     
     # グラフ作成
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
     
+    # x軸は日付を数値（matplotlibの日付値）に一度だけ変換して描画
+    week_x = mdates.date2num(week_starts)
+    
     # 上段: 週次棒グラフ
-    bars = ax1.bar(complete_weeks['week_start'], complete_weeks['total_contributions'], 
+    bars = ax1.bar(week_x, weekly_totals, 
                    width=5, alpha=0.8, color='#2E86C1')
     
-    # 棒の値を表示
-    for bar in bars:
-        height = bar.get_height()
-        if height > 0:
-            ax1.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height):,}',
-                    ha='center', va='bottom', fontsize=9)
+    # 棒の値を表示（0の週はラベルなし）
+    ax1.bar_label(bars, labels=[f'{int(h):,}' if h > 0 else '' for h in weekly_totals],
+                  fontsize=9)
     
     ax1.set_title('Weekly Total Contributions - Group Overview (Complete 7-day weeks only)', fontsize=16, fontweight='bold')
     ax1.set_xlabel('Week (Starting Monday)', fontsize=12)
     ax1.set_ylabel('Weekly Total Contributions', fontsize=12)
+    ax1.xaxis_date()
     ax1.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
     ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
     plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
     ax1.grid(True, alpha=0.3, axis='y')
     
     # 下段: 週次推移線グラフ + 移動平均
-    ax2.plot(complete_weeks['week_start'], complete_weeks['total_contributions'], 
+    # 点数が多い場合はLTTBで間引いて描画
+    line_x, line_y = lttb_downsample(week_x, weekly_totals, downsample)
+    ax2.plot(line_x, line_y, 
              marker='o', linewidth=2, markersize=4, alpha=0.8, 
              color='#2E86C1', label='Weekly Contributions')
     
-    # 4週移動平均を追加
-    complete_weeks['4week_ma'] = complete_weeks['total_contributions'].rolling(window=4, center=True).mean()
-    ax2.plot(complete_weeks['week_start'], complete_weeks['4week_ma'], 
+    # 4週移動平均を追加（rolling(window=4, center=True) と同じ位置合わせ：前2週・後1週はNaN）
+    moving_average = centered_moving_average(weekly_totals, 4)
+    ax2.plot(week_x, moving_average, 
              linewidth=3, alpha=0.7, color='#E74C3C', 
              label='4-Week Moving Average')
     
     ax2.set_title('Weekly Contribution Trend with Moving Average', fontsize=14, fontweight='bold')
     ax2.set_xlabel('Week (Starting Monday)', fontsize=12)
     ax2.set_ylabel('Weekly Total Contributions', fontsize=12)
+    ax2.xaxis_date()
     ax2.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
     ax2.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
     plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
     ax2.grid(True, alpha=0.3)
     ax2.legend()
     
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_weekly_group_trends.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Weekly group trends chart saved: {output_path}_weekly_group_trends.png")
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_weekly_group_trends")
+    plt.close(fig)
+    print(f"Weekly group trends chart saved: {chart_path}")
     
     # 週次統計を出力
     print(f"\n=== Weekly Statistics (Complete 7-day weeks only) ===")
-    print(f"Complete weeks analyzed: {len(complete_weeks)}")
-    print(f"Average weekly contributions: {complete_weeks['total_contributions'].mean():.0f}")
-    print(f"Peak week: {complete_weeks.loc[complete_weeks['total_contributions'].idxmax(), 'week_start'].strftime('%Y-%m-%d')} ({complete_weeks['total_contributions'].max():,} contributions)")
-    print(f"Lowest week: {complete_weeks.loc[complete_weeks['total_contributions'].idxmin(), 'week_start'].strftime('%Y-%m-%d')} ({complete_weeks['total_contributions'].min():,} contributions)")
+    peak = weekly_totals.argmax()
+    lowest = weekly_totals.argmin()
+    print(f"Complete weeks analyzed: {len(weekly_totals)}")
+    print(f"Average weekly contributions: {weekly_totals.mean():.0f}")
+    print(f"Peak week: {np.datetime_as_string(week_starts[peak], unit='D')} ({weekly_totals[peak]:,} contributions)")
+    print(f"Lowest week: {np.datetime_as_string(week_starts[lowest], unit='D')} ({weekly_totals[lowest]:,} contributions)")
 
-def create_weekly_heatmap(data: dict, output_path: str):
+def create_weekly_heatmap(data: dict, output_path: str, df: pd.DataFrame = None):
     """
     週次コントリビューションのヒートマップを作成
     """
-    daily_data = data["daily_aggregate"]
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+    
+    if df is None:
+        df = prepare_daily_frame(data["daily_aggregate"])
     
-    if not daily_data:
+    if df.empty:
         print("No daily data available for heatmap")
         return
     
-    # データフレームに変換
-    df = pd.DataFrame(daily_data)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
-    
-    # 週と年を追加
-    df['year'] = df['date'].dt.year
-    df['week'] = df['date'].dt.isocalendar().week
-    
-    # 週次集計
-    weekly_heatmap = df.groupby(['year', 'week']).agg({
-        'total_contributions': 'sum'
-    }).reset_index()
-    
-    # ピボットテーブル作成
-    pivot_data = weekly_heatmap.pivot(index='year', columns='week', values='total_contributions')
-    pivot_data = pivot_data.fillna(0)
+    # 年×週の行列に直接加算して集計（データのある年・週のみを行・列にする）
+    years, year_index = np.unique(df['year'].to_numpy(), return_inverse=True)
+    weeks, week_index = np.unique(df['week'].to_numpy(), return_inverse=True)
+    heatmap_values = np.zeros((len(years), len(weeks)))
+    np.add.at(heatmap_values, (year_index, week_index), df['total_contributions'].to_numpy())
+    pivot_data = pd.DataFrame(heatmap_values,
+                              index=pd.Index(years, name='year'),
+                              columns=pd.Index(weeks, name='week'))
     
     # ヒートマップ作成
-    plt.figure(figsize=(20, 6))
+    fig, ax = plt.subplots(figsize=(20, 6))
     sns.heatmap(pivot_data, 
+                ax=ax,
                 annot=False, 
                 cmap='YlOrRd', 
                 cbar_kws={'label': 'Weekly Contributions'},
                 linewidths=0.5)
     
-    plt.title('Weekly Contribution Heatmap - Group Activity by Year/Week', fontsize=16, fontweight='bold')
-    plt.xlabel('Week of Year', fontsize=12)
-    plt.ylabel('Year', fontsize=12)
+    ax.set_title('Weekly Contribution Heatmap - Group Activity by Year/Week', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Week of Year', fontsize=12)
+    ax.set_ylabel('Year', fontsize=12)
     
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_weekly_heatmap.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Weekly heatmap saved: {output_path}_weekly_heatmap.png")
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_weekly_heatmap")
+    plt.close(fig)
+    print(f"Weekly heatmap saved: {chart_path}")
 
-def create_weekly_growth_analysis(data: dict, output_path: str):
+def create_weekly_growth_analysis(data: dict, output_path: str, df: pd.DataFrame = None):
     """
     週次成長率分析グラフを作成
     """
-    daily_data = data["daily_aggregate"]
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    from matplotlib.dates import DateFormatter
+    
+    if df is None:
+        df = prepare_daily_frame(data["daily_aggregate"])
     
-    if not daily_data:
+    if df.empty:
         print("No daily data available for growth analysis")
         return
     
-    # データフレームに変換
-    df = pd.DataFrame(daily_data)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
-    
-    # 週の開始日を計算
-    df['week_start'] = df['date'] - pd.to_timedelta(df['date'].dt.dayofweek, unit='d')
-    
     # 週次集計
-    weekly_df = df.groupby('week_start').agg({
-        'total_contributions': 'sum'
-    }).reset_index()
-    
-    # 成長率計算
-    weekly_df['week_over_week_change'] = weekly_df['total_contributions'].pct_change() * 100
-    weekly_df['week_over_week_absolute'] = weekly_df['total_contributions'].diff()
+    weekly_df = aggregate_weekly(df)
+    
+    # 成長率計算（先頭週は比較対象がないためNaN）
+    totals = weekly_df['total_contributions'].to_numpy(dtype=np.float64)
+    absolute = np.full_like(totals, np.nan)
+    np.subtract(totals[1:], totals[:-1], out=absolute[1:])
+    change = np.full_like(totals, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(absolute[1:], totals[:-1], out=change[1:])
+    change[1:] *= 100
+    weekly_df['week_over_week_change'] = change
+    weekly_df['week_over_week_absolute'] = absolute
     
     # グラフ作成
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
     
+    # x軸は日付を数値（matplotlibの日付値）に一度だけ変換して描画
+    week_x = mdates.date2num(weekly_df['week_start'].to_numpy())
+    
     # 上段: 週次絶対変化量
-    colors = ['red' if x < 0 else 'green' for x in weekly_df['week_over_week_absolute']]
-    bars1 = ax1.bar(weekly_df['week_start'], weekly_df['week_over_week_absolute'], 
+    colors = np.where(absolute < 0, 'red', 'green')
+    bars1 = ax1.bar(week_x, weekly_df['week_over_week_absolute'], 
                     width=5, alpha=0.7, color=colors)
     
     ax1.axhline(y=0, color='black', linestyle='-', alpha=0.3)
     ax1.set_title('Week-over-Week Change in Contributions (Absolute)', fontsize=14, fontweight='bold')
     ax1.set_xlabel('Week (Starting Monday)', fontsize=12)
     ax1.set_ylabel('Change in Contributions', fontsize=12)
+    ax1.xaxis_date()
     ax1.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
     ax1.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
     plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
     ax1.grid(True, alpha=0.3, axis='y')
     
     # 下段: 週次成長率（%）
-    colors = ['red' if x < 0 else 'green' for x in weekly_df['week_over_week_change']]
-    bars2 = ax2.bar(weekly_df['week_start'], weekly_df['week_over_week_change'], 
+    colors = np.where(change < 0, 'red', 'green')
+    bars2 = ax2.bar(week_x, weekly_df['week_over_week_change'], 
                     width=5, alpha=0.7, color=colors)
     
     ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
     ax2.set_title('Week-over-Week Growth Rate (%)', fontsize=14, fontweight='bold')
     ax2.set_xlabel('Week (Starting Monday)', fontsize=12)
     ax2.set_ylabel('Growth Rate (%)', fontsize=12)
+    ax2.xaxis_date()
     ax2.xaxis.set_major_formatter(DateFormatter('%Y-%m-%d'))
     ax2.xaxis.set_major_locator(mdates.WeekdayLocator(interval=2))
     plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
     ax2.grid(True, alpha=0.3, axis='y')
     
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_weekly_growth_analysis.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Weekly growth analysis saved: {output_path}_weekly_growth_analysis.png")
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_weekly_growth_analysis")
+    plt.close(fig)
+    print(f"Weekly growth analysis saved: {chart_path}")
 
 def create_all_weekly_charts(data: dict, output_prefix: str):
     """
@@ -227,9 +299,12 @@ def create_all_weekly_charts(data: dict, output_prefix: str):
     """
     print("Creating weekly group trend analysis charts...")
     
-    create_weekly_group_trends(data, output_prefix)
-    create_weekly_heatmap(data, output_prefix)
-    create_weekly_growth_analysis(data, output_prefix)
+    # 日付のパースと週の計算は1回だけ行い、各グラフで共有
+    df = prepare_daily_frame(data["daily_aggregate"])
+    
+    create_weekly_group_trends(data, output_prefix, df)
+    create_weekly_heatmap(data, output_prefix, df)
+    create_weekly_growth_analysis(data, output_prefix, df)
     
     print(f"\nAll weekly charts created with prefix: {output_prefix}")
 
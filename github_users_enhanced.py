@@ -1,161 +1,323 @@
 #!/usr/bin/env python3
 
-import subprocess
+import asyncio
 import json
-import time
+import re
+import sqlite3
 import sys
 import argparse
-from typing import List, Dict
+from urllib.parse import urlencode
+from typing import Callable, List, Dict, Optional, TypedDict
+import aiohttp
+import fast_json
+from github_api import GITHUB_API_URL, get_github_token, request_with_rate_limit
 
-def search_github_users_with_gh(query: str, max_pages: int = 18) -> List[Dict]:
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# 1ページあたりの件数（GitHub APIの最大値）と同時に取得するページ数
+PER_PAGE = 100
+PAGE_CONCURRENCY = 8
+
+# 検索APIで取得できる件数の上限
+SEARCH_RESULTS_LIMIT = 1000
+
+# ページ単位のレスポンスキャッシュ（ETagで変更の有無を確認し、304なら保存済みの本文を使う）
+DEFAULT_PAGE_CACHE_PATH = ".gh_pages_cache.sqlite3"
+
+# 全リクエスト共通のHTTPヘッダー（Authorizationはmain()で設定）
+_headers = {"Accept": "application/vnd.github+json"}
+
+# REST APIレスポンスのスキーマ（保存するフィールドのみ。URL類など未使用フィールドはデコード時に読み飛ばす）
+class UserItem(TypedDict):
+    login: str
+    id: int
+    avatar_url: str
+    html_url: str
+    type: str
+
+class SearchUserItem(UserItem, total=False):
+    score: float
+
+class MemberItem(UserItem, total=False):
+    site_admin: bool
+
+class SearchPage(TypedDict):
+    items: List[SearchUserItem]
+
+class SearchCount(TypedDict):
+    total_count: int
+
+if msgspec is not None:
+    _search_page_decoder = msgspec.json.Decoder(SearchPage)
+    _search_count_decoder = msgspec.json.Decoder(SearchCount)
+    _member_page_decoder = msgspec.json.Decoder(List[MemberItem])
+    DECODE_ERRORS = (fast_json.JSONDecodeError, msgspec.DecodeError)
+else:
+    _search_page_decoder = None
+    _search_count_decoder = None
+    _member_page_decoder = None
+    DECODE_ERRORS = (fast_json.JSONDecodeError,)
+
+def decode_search_page(content: bytes) -> List[Dict]:
     """
-    GitHub CLI (gh)を使用してユーザーを検索する
+    ユーザー検索結果の1ページをデコード（msgspecがあれば必要なフィールドのみデコード）
     """
-    all_users = []
-    per_page = 100  # GitHub APIの最大値
-    
-    print(f"Searching for users matching '{query}' using GitHub CLI...")
+    if _search_page_decoder is not None:
+        return _search_page_decoder.decode(content)["items"]
+    return fast_json.loads(content).get("items", [])
+
+def count_search_pages(content: bytes) -> int:
+    """
+    ユーザー検索結果の total_count から取得可能なページ数を計算（検索APIの上限件数まで）
+    """
+    if _search_count_decoder is not None:
+        total_count = _search_count_decoder.decode(content)["total_count"]
+    else:
+        total_count = fast_json.loads(content).get("total_count", 0)
+    return -(-min(total_count, SEARCH_RESULTS_LIMIT) // PER_PAGE)
+
+def decode_member_page(content: bytes) -> List[Dict]:
+    """
+    Organizationメンバー一覧の1ページをデコード（msgspecがあれば必要なフィールドのみデコード）
+    """
+    if _member_page_decoder is not None:
+        return _member_page_decoder.decode(content)
+    return fast_json.loads(content)
+
+def open_page_cache(cache_path: str) -> sqlite3.Connection:
+    """
+    ページ単位のレスポンスキャッシュDBを開く
+    """
+    conn = sqlite3.connect(cache_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            etag TEXT NOT NULL,
+            body BLOB NOT NULL,
+            last_page INTEGER
+        )
+    """)
     
-    for page in range(1, max_pages + 1):
-        print(f"Fetching page {page}/{max_pages}...")
-        
+    # 最終ページ番号の列がない古いキャッシュには列を追加する
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+    if "last_page" not in columns:
+        conn.execute("ALTER TABLE pages ADD COLUMN last_page INTEGER")
+    return conn
+
+def find_last_page(response: aiohttp.ClientResponse, content: bytes,
+                   count_pages: Callable[[bytes], int] = None) -> Optional[int]:
+    """
+    1ページ目の200レスポンスから最終ページ番号を求める（Linkヘッダーの rel="last" → 件数から計算の順、不明ならNone）
+    """
+    match = re.search(r'[?&]page=(\d+)[^>]*>;\s*rel="last"', response.headers.get("Link", ""))
+    if match:
+        return int(match.group(1))
+    if count_pages is not None:
         try:
-            # gh api コマンドを使用してGitHub REST APIを直接呼び出し
-            api_url = f"search/users?q={query}&per_page={per_page}&page={page}"
-            cmd = ["gh", "api", api_url]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            data = json.loads(result.stdout)
-            
-            users = data.get("items", [])
-            if not users:
-                print(f"No more users found on page {page}")
-                break
-            
-            for user in users:
-                user_info = {
-                    "login": user["login"],
-                    "id": user["id"],
-                    "avatar_url": user["avatar_url"],
-                    "html_url": user["html_url"],
-                    "type": user["type"],
-                    "score": user.get("score", 0),
-                    "source": "search"
-                }
-                all_users.append(user_info)
-            
-            print(f"Found {len(users)} users on page {page}")
-            
-            # API rate limitを避けるため少し待機
-            time.sleep(0.5)
-            
-        except subprocess.CalledProcessError as e:
-            print(f"Error on page {page}: {e}")
-            print(f"stderr: {e.stderr}")
-            break
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error on page {page}: {e}")
-            break
+            return count_pages(content)
+        except DECODE_ERRORS:
+            return None
+    # Linkヘッダーがなければ1ページのみ
+    return 1
+
+def parse_page(page: int, result, decode: Callable[[bytes], List[Dict]],
+               not_found_message: str) -> Optional[List[Dict]]:
+    """
+    1ページ分のレスポンスから要素の一覧を取り出す（エラー時はメッセージを表示してNone）
+    """
+    if isinstance(result, BaseException):
+        print(f"Error on page {page}: {result}")
+        return None
     
-    return all_users
+    response, content, _ = result
+    if response.status == 404:
+        print(not_found_message)
+        return None
+    if response.status >= 400:
+        print(f"Error on page {page}: HTTP {response.status}")
+        print(f"response: {content.decode('utf-8', errors='replace')}")
+        return None
+    
+    try:
+        return decode(content)
+    except DECODE_ERRORS as e:
+        print(f"JSON decode error on page {page}: {e}")
+        return None
 
-def get_organization_members(org_name: str, max_pages: int = 50) -> List[Dict]:
+async def fetch_all_pages(path: str, params: Dict, max_pages: int, decode: Callable[[bytes], List[Dict]],
+                          not_found_message: str = "Not Found", cache_path: str = None,
+                          count_pages: Callable[[bytes], int] = None) -> List[Dict]:
     """
-    特定のOrganizationのメンバー一覧を取得する
+    ページングされたREST APIを取得する（cache_path指定時はETagキャッシュを利用）
+    1ページ目で最終ページがわかればそこまでを同時に取得し、わからなければ1ページずつ取得する
+    空のページ・最終ページ（件数がPER_PAGE未満）・エラーのいずれかで停止
     """
-    all_members = []
-    per_page = 100  # GitHub APIの最大値
+    url = f"{GITHUB_API_URL}/{path}"
+    semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+    cache = open_page_cache(cache_path) if cache_path else None
+    all_items = []
+    total_pages = max_pages
     
-    print(f"Fetching members of organization '{org_name}'...")
+    async def fetch_page(session: aiohttp.ClientSession, page: int):
+        page_params = {**params, "per_page": PER_PAGE, "page": page}
+        cache_key = f"{path}?{urlencode(page_params)}"
+        cached = None
+        if cache is not None:
+            cached = cache.execute("SELECT etag, body, last_page FROM pages WHERE url = ?",
+                                   (cache_key,)).fetchone()
+        
+        # 保存済みのETagを送り、変更がなければ304（レート制限の消費なし）を受け取る
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        async with semaphore:
+            print(f"Fetching page {page}/{total_pages}...")
+            response, content = await request_with_rate_limit(session, "GET", url, f"page {page}",
+                                                              params=page_params, headers=headers)
+        
+        # 304ではLinkヘッダーが返らないことがあるため、最終ページ番号もキャッシュから取り出す
+        if response.status == 304 and cached:
+            return response, cached[1], cached[2]
+        last_page = None
+        if page == 1 and response.status == 200:
+            last_page = find_last_page(response, content, count_pages)
+        etag = response.headers.get("ETag")
+        if cache is not None and response.status == 200 and etag:
+            with cache:
+                cache.execute("INSERT OR REPLACE INTO pages (url, etag, body, last_page) VALUES (?, ?, ?, ?)",
+                              (cache_key, etag, content, last_page))
+        return response, content, last_page
     
-    for page in range(1, max_pages + 1):
-        print(f"Fetching page {page}...")
+    def collect(page: int, result) -> bool:
+        """
+        1ページ分の結果を追加し、続きのページを確認すべきかを返す
+        """
+        items = parse_page(page, result, decode, not_found_message)
+        if items is None:
+            return False
+        if not items:
+            print(f"No more results found on page {page}")
+            return False
         
-        try:
-            # Organization のメンバー一覧を取得
-            api_url = f"orgs/{org_name}/members?per_page={per_page}&page={page}"
-            cmd = ["gh", "api", api_url]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            members = json.loads(result.stdout)
-            
-            if not members:
-                print(f"No more members found on page {page}")
-                break
-            
-            for member in members:
-                member_info = {
-                    "login": member["login"],
-                    "id": member["id"],
-                    "avatar_url": member["avatar_url"],
-                    "html_url": member["html_url"],
-                    "type": member["type"],
-                    "site_admin": member.get("site_admin", False),
-                    "source": f"org_member:{org_name}"
-                }
-                all_members.append(member_info)
+        all_items.extend(items)
+        print(f"Found {len(items)} results on page {page}")
+        return len(items) == PER_PAGE
+    
+    timeout = aiohttp.ClientTimeout(total=30)
+    try:
+        async with aiohttp.ClientSession(headers=_headers, timeout=timeout) as session:
+            # 1ページ目を先に取得し、最終ページを確認してから残りのページを要求する
+            [first] = await asyncio.gather(fetch_page(session, 1), return_exceptions=True)
+            if not collect(1, first) or max_pages <= 1:
+                return all_items
             
-            print(f"Found {len(members)} members on page {page}")
+            last_page = first[2]
+            if last_page is None:
+                # 最終ページが不明な場合（最終ページ番号のない古いキャッシュ）は、短いページが来るまで1ページずつ取得
+                for page in range(2, max_pages + 1):
+                    [result] = await asyncio.gather(fetch_page(session, page), return_exceptions=True)
+                    if not collect(page, result):
+                        return all_items
+                return all_items
             
-            # API rate limitを避けるため少し待機
-            time.sleep(0.5)
+            total_pages = min(last_page, max_pages)
+            pages = range(2, total_pages + 1)
+            results = await asyncio.gather(*(fetch_page(session, page) for page in pages),
+                                           return_exceptions=True)
             
-        except subprocess.CalledProcessError as e:
-            print(f"Error on page {page}: {e}")
-            if "Not Found" in e.stderr:
-                print(f"Organization '{org_name}' not found or no public members")
-                break
-            print(f"stderr: {e.stderr}")
-            break
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error on page {page}: {e}")
-            break
+            # ページ順に結果を確認し、最初に終端に達したページで打ち切る
+            for page, result in zip(pages, results):
+                if not collect(page, result):
+                    return all_items
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    return all_items
+
+def search_github_users_with_gh(query: str, max_pages: int = 18, source: str = "search",
+                                cache_path: str = None) -> List[Dict]:
+    """
+    GitHub REST APIを使用してユーザーを検索する（source は各ユーザーの取得元として記録）
+    """
+    print(f"Searching for users matching '{query}' using GitHub API...")
+    
+    # 上限を超えるページはエラーになるため取得しない
+    max_pages = min(max_pages, SEARCH_RESULTS_LIMIT // PER_PAGE)
     
-    return all_members
+    users = asyncio.run(fetch_all_pages("search/users", {"q": query}, max_pages, decode_search_page,
+                                        cache_path=cache_path, count_pages=count_search_pages))
+    return [
+        {
+            "login": user["login"],
+            "id": user["id"],
+            "avatar_url": user["avatar_url"],
+            "html_url": user["html_url"],
+            "type": user["type"],
+            "score": user.get("score", 0),
+            "source": source
+        }
+        for user in users
+    ]
 
-def get_organization_public_members(org_name: str) -> List[Dict]:
+def get_organization_members(org_name: str, max_pages: int = 50, cache_path: str = None) -> List[Dict]:
+    """
+    特定のOrganizationのメンバー一覧を取得する
+    """
+    print(f"Fetching members of organization '{org_name}'...")
+    
+    members = asyncio.run(fetch_all_pages(
+        f"orgs/{org_name}/members", {}, max_pages, decode_member_page,
+        not_found_message=f"Organization '{org_name}' not found or no public members",
+        cache_path=cache_path))
+    return [
+        {
+            "login": member["login"],
+            "id": member["id"],
+            "avatar_url": member["avatar_url"],
+            "html_url": member["html_url"],
+            "type": member["type"],
+            "site_admin": member.get("site_admin", False),
+            "source": f"org_member:{org_name}"
+        }
+        for member in members
+    ]
+
+def get_organization_public_members(org_name: str, cache_path: str = None) -> List[Dict]:
     """
     特定のOrganizationのpublicメンバー一覧を取得する（権限不要版）
     """
-    all_members = []
-    per_page = 100
     max_pages = 50
     
     print(f"Fetching public members of organization '{org_name}'...")
     
-    for page in range(1, max_pages + 1):
-        try:
-            api_url = f"orgs/{org_name}/public_members?per_page={per_page}&page={page}"
-            cmd = ["gh", "api", api_url]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            members = json.loads(result.stdout)
-            
-            if not members:
-                break
-            
-            for member in members:
-                member_info = {
-                    "login": member["login"],
-                    "id": member["id"],
-                    "avatar_url": member["avatar_url"],
-                    "html_url": member["html_url"],
-                    "type": member["type"],
-                    "site_admin": member.get("site_admin", False),
-                    "source": f"org_public_member:{org_name}"
-                }
-                all_members.append(member_info)
-            
-            print(f"Found {len(members)} public members on page {page}")
-            time.sleep(0.5)
-            
-        except subprocess.CalledProcessError as e:
-            if "Not Found" in e.stderr:
-                print(f"Organization '{org_name}' not found")
-                break
-            break
-    
-    return all_members
+    members = asyncio.run(fetch_all_pages(
+        f"orgs/{org_name}/public_members", {}, max_pages, decode_member_page,
+        not_found_message=f"Organization '{org_name}' not found",
+        cache_path=cache_path))
+    return [
+        {
+            "login": member["login"],
+            "id": member["id"],
+            "avatar_url": member["avatar_url"],
+            "html_url": member["html_url"],
+            "type": member["type"],
+            "site_admin": member.get("site_admin", False),
+            "source": f"org_public_member:{org_name}"
+        }
+        for member in members
+    ]
+
+def set_github_token() -> bool:
+    """
+    GitHubトークンを取得してリクエストヘッダーに設定（見つからなければFalse）
+    """
+    token = get_github_token()
+    if not token:
+        return False
+    _headers["Authorization"] = f"bearer {token}"
+    return True
 
 def save_users_to_file(users: List[Dict], filename: str):
     """
@@ -175,15 +337,17 @@ def main():
                        help='Maximum pages to fetch (default: 18)')
     parser.add_argument('--output', '-o',
                        help='Output filename (auto-generated if not specified)')
+    parser.add_argument('--cache-file', default=DEFAULT_PAGE_CACHE_PATH,
+                       help=f'Page cache file for conditional requests (default: {DEFAULT_PAGE_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Do not read or write the page cache')
     
     args = parser.parse_args()
     
-    # GitHub CLIがインストールされているかチェック
-    try:
-        subprocess.run(["gh", "--version"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
-        print("Error: GitHub CLI (gh) is not installed or not authenticated.")
-        print("Please install gh and run 'gh auth login' first.")
+    # GitHubトークンを確認
+    if not set_github_token():
+        print("Error: GitHub token not found.")
+        print("Please set GITHUB_TOKEN or run 'gh auth login' first.")
         sys.exit(1)
     
     # 出力ファイル名を決定
@@ -199,13 +363,14 @@ def main():
             output_file = f"github_org_public_members_{safe_query}.json"
     
     # モードに応じて処理を実行
+    cache_path = None if args.no_cache else args.cache_file
     users = []
     if args.mode == 'search':
-        users = search_github_users_with_gh(args.query, args.max_pages)
+        users = search_github_users_with_gh(args.query, args.max_pages, cache_path=cache_path)
     elif args.mode == 'org':
-        users = get_organization_members(args.query, args.max_pages)
+        users = get_organization_members(args.query, args.max_pages, cache_path)
     elif args.mode == 'org-public':
-        users = get_organization_public_members(args.query)
+        users = get_organization_public_members(args.query, cache_path)
     
     if users:
         save_users_to_file(users, output_file)
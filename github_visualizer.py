@@ -1,183 +1,257 @@
 #!/usr/bin/env python3
 
-import json
+from __future__ import annotations
+
 import argparse
+import gc
+import os
 import sys
-from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.dates import DateFormatter
-import pandas as pd
-import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+import fast_json
+from chart_utils import (CHART_FORMATS, DEFAULT_CHART_DPI, DEFAULT_MAX_LINE_POINTS, centered_moving_average,
+                         lttb_downsample, save_figure)
+
+# pandas・matplotlib・seabornは読み込みが重いため、使用する関数内でimportする
+if TYPE_CHECKING:
+    import pandas as pd
 
-# 日本語フォントの設定
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
+def setup_plotting():
+    """
+    描画ライブラリを読み込み、グラフのスタイルを設定
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # ファイル出力のみのため非対話バックエンドを使用
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    # 日本語フォントの設定
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    sns.set_style("whitegrid")
+    
+    # 密な折れ線グラフの描画を軽くする（1ピクセル未満の頂点を省略し、長いパスは分割して描画）
+    plt.rcParams['path.simplify'] = True
+    plt.rcParams['path.simplify_threshold'] = 1.0
+    plt.rcParams['agg.path.chunksize'] = 10000
+
+# 作成できるグラフの種類（--chart-type で指定する名前）
+CHART_TYPES = ('daily', 'monthly', 'users', 'breakdown', 'trend')
 
 def load_visualization_data(filepath: str) -> dict:
     """
     グラフ化用データを読み込む
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return fast_json.load_file(filepath)
     except Exception as e:
         print(f"Error loading visualization data: {e}")
         return None
 
-def create_daily_contributions_chart(data: dict, output_path: str):
+def get_column(rows, key: str) -> list:
+    """
+    列の値を取り出す（カラム形式・レコード形式のどちらにも対応）
+    """
+    if isinstance(rows, dict):
+        return rows.get(key, [])
+    return [row[key] for row in rows]
+
+def head_rows(rows, n: int):
+    """
+    先頭n件を取り出す（カラム形式・レコード形式のどちらにも対応）
+    """
+    if isinstance(rows, dict):
+        return {key: values[:n] for key, values in rows.items()}
+    return rows[:n]
+
+def prepare_time_series(rows, date_key: str, unit: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    日付（ISO形式の文字列）と合計値の配列を作成し、日付順に並べる
+    """
+    dates = np.array(get_column(rows, date_key), dtype=f'datetime64[{unit}]').astype('datetime64[D]')
+    totals = np.asarray(get_column(rows, 'total_contributions'), dtype=np.int64)
+    
+    # 分析結果は通常日付順のため、並んでいない場合のみ並べ替える
+    if np.any(dates[1:] < dates[:-1]):
+        order = np.argsort(dates, kind='stable')
+        dates, totals = dates[order], totals[order]
+    return dates, totals
+
+def prepare_daily_series(daily_data) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    日別データから日付順の（日付, 合計）配列を作成
+    """
+    return prepare_time_series(daily_data, 'date', 'D')
+
+def prepare_monthly_series(monthly_data) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    月別データから月順の（月初日, 合計）配列を作成
+    """
+    return prepare_time_series(monthly_data, 'month', 'M')
+
+def create_daily_contributions_chart(data: dict, output_path: str, series: Tuple[np.ndarray, np.ndarray] = None,
+                                     dpi: int = DEFAULT_CHART_DPI, image_format: str = 'png',
+                                     downsample: int = DEFAULT_MAX_LINE_POINTS):
     """
     日別コントリビューション合計のグラフを作成
     """
-    daily_data = data["daily_aggregate"]
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    from matplotlib.dates import DateFormatter
+    
+    if series is None:
+        series = prepare_daily_series(data["daily_aggregate"])
+    dates, totals = series
     
-    if not daily_data:
+    if len(dates) == 0:
         print("No daily data available for charting")
         return
     
-    # データフレームに変換
-    df = pd.DataFrame(daily_data)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date')
-    
     # グラフ作成
-    plt.figure(figsize=(15, 6))
-    plt.plot(df['date'], df['total_contributions'], linewidth=1, alpha=0.8)
-    plt.fill_between(df['date'], df['total_contributions'], alpha=0.3)
+    fig, ax = plt.subplots(figsize=(15, 6))
+    
+    # 点数が多い場合はLTTBで間引いて描画
+    dates, totals = lttb_downsample(dates, totals, downsample)
+    ax.plot(dates, totals, linewidth=1, alpha=0.8)
+    ax.fill_between(dates, totals, alpha=0.3)
     
-    plt.title('Daily Total Contributions - All Users Combined', fontsize=16, fontweight='bold')
-    plt.xlabel('Date', fontsize=12)
-    plt.ylabel('Total Contributions', fontsize=12)
+    ax.set_title('Daily Total Contributions - All Users Combined', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Total Contributions', fontsize=12)
     
     # X軸の日付フォーマット
-    plt.gca().xaxis.set_major_formatter(DateFormatter('%Y-%m'))
-    plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=1))
-    plt.xticks(rotation=45)
-    
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_daily_contributions.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Daily contributions chart saved: {output_path}_daily_contributions.png")
+    ax.xaxis.set_major_formatter(DateFormatter('%Y-%m'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_daily_contributions", dpi, image_format, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Daily contributions chart saved: {chart_path}")
 
-def create_monthly_contributions_chart(data: dict, output_path: str):
+def create_monthly_contributions_chart(data: dict, output_path: str, series: Tuple[np.ndarray, np.ndarray] = None,
+                                       dpi: int = DEFAULT_CHART_DPI, image_format: str = 'png'):
     """
     月別コントリビューション合計のグラフを作成
     """
-    monthly_data = data["monthly_aggregate"]
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    from matplotlib.dates import DateFormatter
+    
+    if series is None:
+        series = prepare_monthly_series(data["monthly_aggregate"])
+    months, totals = series
     
-    if not monthly_data:
+    if len(months) == 0:
         print("No monthly data available for charting")
         return
     
-    # データフレームに変換
-    df = pd.DataFrame(monthly_data)
-    df['month'] = pd.to_datetime(df['month'])
-    df = df.sort_values('month')
-    
     # グラフ作成
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(df['month'], df['total_contributions'], width=20, alpha=0.8)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(months, totals, width=20, alpha=0.8)
     
-    # バーの値を表示
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
-                f'{int(height):,}',
-                ha='center', va='bottom', fontsize=9)
+    # バーの値を表示（fmtの{}形式はmatplotlib 3.7以降のみのため、ラベル文字列を渡す）
+    ax.bar_label(bars, labels=[f'{int(v):,}' for v in totals], fontsize=9)
     
-    plt.title('Monthly Total Contributions - All Users Combined', fontsize=16, fontweight='bold')
-    plt.xlabel('Month', fontsize=12)
-    plt.ylabel('Total Contributions', fontsize=12)
+    ax.set_title('Monthly Total Contributions - All Users Combined', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Month', fontsize=12)
+    ax.set_ylabel('Total Contributions', fontsize=12)
     
     # X軸の日付フォーマット
-    plt.gca().xaxis.set_major_formatter(DateFormatter('%Y-%m'))
-    plt.xticks(rotation=45)
-    
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_monthly_contributions.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Monthly contributions chart saved: {output_path}_monthly_contributions.png")
+    ax.xaxis.set_major_formatter(DateFormatter('%Y-%m'))
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_monthly_contributions", dpi, image_format, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Monthly contributions chart saved: {chart_path}")
 
-def create_user_comparison_chart(data: dict, output_path: str, top_n: int = 20):
+def create_user_comparison_chart(data: dict, output_path: str, top_n: int = 20,
+                                 users_df: pd.DataFrame = None, dpi: int = DEFAULT_CHART_DPI, image_format: str = 'png'):
     """
     ユーザー別コントリビューション比較グラフを作成
     """
-    user_data = data["user_comparison"][:top_n]
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    
+    # データフレームに変換（カラム形式・レコード形式のどちらにも対応）
+    if users_df is None:
+        users_df = pd.DataFrame(head_rows(data["user_comparison"], top_n))
+    df = users_df.head(top_n)
     
-    if not user_data:
+    if df.empty:
         print("No user data available for charting")
         return
     
-    # データフレームに変換
-    df = pd.DataFrame(user_data)
-    
     # グラフ作成
-    plt.figure(figsize=(14, 8))
+    fig, ax = plt.subplots(figsize=(14, 8))
     
     # 横棒グラフ
-    bars = plt.barh(range(len(df)), df['total_contributions'], alpha=0.8)
+    bars = ax.barh(range(len(df)), df['total_contributions'], alpha=0.8)
     
     # ユーザー名を表示（名前がある場合は名前も）
-    labels = []
-    for _, row in df.iterrows():
-        if row['name']:
-            labels.append(f"{row['username']}\n({row['name']})")
-        else:
-            labels.append(row['username'])
+    labels = [f"{username}\n({name})" if name else username
+              for username, name in zip(df['username'].tolist(), df['name'].tolist())]
     
-    plt.yticks(range(len(df)), labels)
+    ax.set_yticks(range(len(df)))
+    ax.set_yticklabels(labels)
     
     # バーの値を表示
-    for i, bar in enumerate(bars):
-        width = bar.get_width()
-        plt.text(width, bar.get_y() + bar.get_height()/2.,
-                f'{int(width):,}',
-                ha='left', va='center', fontsize=9)
-    
-    plt.title(f'Top {top_n} Contributors - Total Contributions', fontsize=16, fontweight='bold')
-    plt.xlabel('Total Contributions', fontsize=12)
-    plt.ylabel('Users', fontsize=12)
-    
-    plt.grid(True, alpha=0.3, axis='x')
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_user_comparison.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"User comparison chart saved: {output_path}_user_comparison.png")
+    ax.bar_label(bars, labels=[f'{int(v):,}' for v in df['total_contributions'].tolist()], fontsize=9)
+    
+    ax.set_title(f'Top {top_n} Contributors - Total Contributions', fontsize=16, fontweight='bold')
+    ax.set_xlabel('Total Contributions', fontsize=12)
+    ax.set_ylabel('Users', fontsize=12)
+    
+    ax.grid(True, alpha=0.3, axis='x')
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_user_comparison", dpi, image_format, bbox_inches='tight')
+    plt.close(fig)
+    print(f"User comparison chart saved: {chart_path}")
 
-def create_contribution_breakdown_chart(data: dict, output_path: str, top_n: int = 15):
+def create_contribution_breakdown_chart(data: dict, output_path: str, top_n: int = 15,
+                                        users_df: pd.DataFrame = None, dpi: int = DEFAULT_CHART_DPI, image_format: str = 'png'):
     """
     上位ユーザーのコントリビューション内訳（積み上げ棒グラフ）を作成
     """
-    user_data = data["user_comparison"][:top_n]
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    
+    # データフレームに変換（カラム形式・レコード形式のどちらにも対応）
+    if users_df is None:
+        users_df = pd.DataFrame(head_rows(data["user_comparison"], top_n))
+    df = users_df.head(top_n)
     
-    if not user_data:
+    if df.empty:
         print("No user data available for breakdown chart")
         return
     
-    # データフレームに変換
-    df = pd.DataFrame(user_data)
-    
     # グラフ作成
     fig, ax = plt.subplots(figsize=(14, 8))
     
-    # 積み上げ棒グラフ
-    bottom = [0] * len(df)
-    
+    # 積み上げ棒グラフ（各カテゴリの値を1つの配列にまとめ、左端を累積していく）
     categories = ['commits', 'prs', 'issues', 'reviews']
     colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+    values = df[categories].to_numpy(dtype=np.int64)
+    bottom = np.zeros(len(df), dtype=np.int64)
     
     for i, (category, color) in enumerate(zip(categories, colors)):
-        values = df[category].tolist()
-        bars = ax.barh(range(len(df)), values, left=bottom, 
+        bars = ax.barh(range(len(df)), values[:, i], left=bottom, 
                       label=category.replace('prs', 'Pull Requests').title(), 
                       color=color, alpha=0.8)
-        bottom = [b + v for b, v in zip(bottom, values)]
+        bottom = bottom + values[:, i]
+    
+    # 積み上げ後の合計（bottom）から横軸の範囲を決め、自動スケールの再計算を省く
+    ax.set_xlim(0, max(bottom.max(), 1) * 1.1)
     
     # ユーザー名を表示
-    labels = [row['username'] for _, row in df.iterrows()]
+    labels = df['username'].tolist()
     ax.set_yticks(range(len(df)))
     ax.set_yticklabels(labels)
     
@@ -188,80 +262,155 @@ def create_contribution_breakdown_chart(data: dict, output_path: str, top_n: int
     ax.legend(loc='lower right')
     ax.grid(True, alpha=0.3, axis='x')
     
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_contribution_breakdown.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Contribution breakdown chart saved: {output_path}_contribution_breakdown.png")
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_contribution_breakdown", dpi, image_format, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Contribution breakdown chart saved: {chart_path}")
 
-def create_top_users_trend_chart(data: dict, output_path: str, top_n: int = 5):
+def create_top_users_trend_chart(data: dict, output_path: str, top_n: int = 5,
+                                 dpi: int = DEFAULT_CHART_DPI, image_format: str = 'png'):
     """
     上位ユーザーの日別コントリビューショントレンドを作成
     """
+    setup_plotting()
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    from matplotlib.dates import DateFormatter
+    import seaborn as sns
+    
     trend_data = data["top_users_trend"]
     
     if not trend_data:
         print("No trend data available for charting")
         return
     
-    plt.figure(figsize=(15, 8))
+    fig, ax = plt.subplots(figsize=(15, 8))
     
-    colors = plt.cm.Set1(range(len(trend_data)))
+    top_users = list(trend_data.items())[:top_n]
     
-    for i, (username, user_trend) in enumerate(list(trend_data.items())[:top_n]):
-        if not user_trend:
+    # 描画するユーザー数分の色を一度だけ用意（Set1の9色を超える場合は繰り返す）
+    palette = sns.color_palette("Set1", n_colors=len(top_users))
+    
+    # 全ユーザーの日付文字列の重複を除き、1回だけパースして各ユーザーで共有
+    date_columns = [get_column(user_trend, 'date') for _, user_trend in top_users]
+    all_dates = np.array([date for dates in date_columns for date in dates], dtype=str)
+    unique_dates, date_index = np.unique(all_dates, return_inverse=True)
+    parsed_dates = unique_dates.astype('datetime64[D]')
+    offsets = np.cumsum([0] + [len(dates) for dates in date_columns])
+    
+    for i, (username, user_trend) in enumerate(top_users):
+        user_index = date_index[offsets[i]:offsets[i + 1]]
+        if len(user_index) == 0:
             continue
         
-        df = pd.DataFrame(user_trend)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date')
+        # ISO形式の日付は文字列順＝日付順のため、並んでいない場合のみインデックス順に並べ替える
+        contributions = np.asarray(get_column(user_trend, 'contributions'), dtype=np.int64)
+        if np.any(user_index[1:] < user_index[:-1]):
+            order = np.argsort(user_index, kind='stable')
+            user_index, contributions = user_index[order], contributions[order]
         
         # 7日移動平均を計算（スムージング）
-        df['contributions_smooth'] = df['contributions'].rolling(window=7, center=True).mean()
+        contributions_smooth = centered_moving_average(contributions, 7)
         
-        plt.plot(df['date'], df['contributions_smooth'], 
-                label=username, linewidth=2, color=colors[i], alpha=0.8)
+        ax.plot(parsed_dates[user_index], contributions_smooth, 
+                label=username, linewidth=2, color=palette[i], alpha=0.8)
     
-    plt.title(f'Top {top_n} Contributors - Daily Contribution Trends (7-day moving average)', 
-              fontsize=16, fontweight='bold')
-    plt.xlabel('Date', fontsize=12)
-    plt.ylabel('Daily Contributions (smoothed)', fontsize=12)
+    ax.set_title(f'Top {top_n} Contributors - Daily Contribution Trends (7-day moving average)', 
+                 fontsize=16, fontweight='bold')
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Daily Contributions (smoothed)', fontsize=12)
     
     # X軸の日付フォーマット
-    plt.gca().xaxis.set_major_formatter(DateFormatter('%Y-%m'))
-    plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=2))
-    plt.xticks(rotation=45)
-    
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(f"{output_path}_top_users_trend.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    print(f"Top users trend chart saved: {output_path}_top_users_trend.png")
+    ax.xaxis.set_major_formatter(DateFormatter('%Y-%m'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    chart_path = save_figure(fig, f"{output_path}_top_users_trend", dpi, image_format, bbox_inches='tight')
+    plt.close(fig)
+    print(f"Top users trend chart saved: {chart_path}")
 
-def create_all_charts(data: dict, output_prefix: str):
+def run_chart_job(chart, *args, **kwargs):
     """
-    すべてのグラフを作成
+    ワーカープロセスでグラフを1つ作成し、次のグラフの前に閉じた図のメモリを解放する
     """
-    print("Creating all visualization charts...")
-    
-    create_daily_contributions_chart(data, output_prefix)
-    create_monthly_contributions_chart(data, output_prefix)
-    create_user_comparison_chart(data, output_prefix)
-    create_contribution_breakdown_chart(data, output_prefix)
-    create_top_users_trend_chart(data, output_prefix)
+    chart(*args, **kwargs)
+    gc.collect()
+
+def create_all_charts(data: dict, output_prefix: str, max_workers: int = None,
+                      dpi: int = DEFAULT_CHART_DPI, top_n: int = None, image_format: str = 'png',
+                      chart_types: List[str] = None):
+    """
+    すべてのグラフ（chart_types指定時はその種類のみ）を作成
+    """
+    selected = set(chart_types or CHART_TYPES)
+    print("Creating all visualization charts..." if not chart_types
+          else f"Creating charts: {', '.join(t for t in CHART_TYPES if t in selected)}...")
+    
+    # 表示する上位ユーザーのみを切り出してからデータフレームを作成し、比較・内訳グラフで共有
+    # （top_n未指定時は各グラフの既定値を使い、最大は比較グラフの20人）
+    top_kwargs = {"top_n": top_n} if top_n else {}
+    users_df = None
+    if selected & {'users', 'breakdown'}:
+        import pandas as pd
+        users_df = pd.DataFrame(head_rows(data["user_comparison"], top_n or 20))
+    
+    # 各グラフは独立しているため、別プロセスで並列に描画・保存（日付のパースは必要なグラフの分のみ）
+    # ワーカーへは各グラフが参照するデータのみを渡し、データ全体を毎回シリアライズしない
+    chart_jobs = []
+    if 'daily' in selected:
+        chart_jobs.append((create_daily_contributions_chart, {},
+                           {"series": prepare_daily_series(data["daily_aggregate"])}))
+    if 'monthly' in selected:
+        chart_jobs.append((create_monthly_contributions_chart, {},
+                           {"series": prepare_monthly_series(data["monthly_aggregate"])}))
+    if 'users' in selected:
+        chart_jobs.append((create_user_comparison_chart, {}, {"users_df": users_df, **top_kwargs}))
+    if 'breakdown' in selected:
+        chart_jobs.append((create_contribution_breakdown_chart, {}, {"users_df": users_df, **top_kwargs}))
+    if 'trend' in selected:
+        chart_jobs.append((create_top_users_trend_chart, {"top_users_trend": data["top_users_trend"]}, top_kwargs))
+    
+    workers = max_workers or min(len(chart_jobs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_chart_job, chart, chart_data, output_prefix,
+                                   dpi=dpi, image_format=image_format, **kwargs)
+                   for chart, chart_data, kwargs in chart_jobs]
+        for future in futures:
+            future.result()
     
     print(f"\nAll charts created with prefix: {output_prefix}")
 
+def parse_chart_types(value: str) -> List[str]:
+    """
+    --chart-type の値（カンマ区切り）を検証してリストに変換
+    """
+    chart_types = [t.strip() for t in value.split(',') if t.strip()]
+    invalid = [t for t in chart_types if t not in CHART_TYPES + ('all',)]
+    if not chart_types or invalid:
+        shown = ', '.join(invalid) if invalid else repr(value)
+        raise argparse.ArgumentTypeError(
+            f"invalid chart type: {shown} (choose from {', '.join(CHART_TYPES)}, all)")
+    return chart_types
+
 def main():
     parser = argparse.ArgumentParser(description='GitHub contribution data visualizer')
     parser.add_argument('--data-file', '-f', required=True,
                        help='Visualization data JSON file (from github_batch_analyzer.py)')
     parser.add_argument('--output-prefix', '-o', default='contrib_charts',
                        help='Output charts prefix (default: contrib_charts)')
-    parser.add_argument('--chart-type', choices=['daily', 'monthly', 'users', 'breakdown', 'trend', 'all'],
-                       default='all', help='Type of chart to create (default: all)')
-    parser.add_argument('--top-n', type=int, default=20,
-                       help='Number of top users to show in charts (default: 20)')
+    parser.add_argument('--chart-type', type=parse_chart_types, default=['all'],
+                       help=f'Type of chart to create; comma-separated for several, '
+                            f'e.g. daily,monthly ({", ".join(CHART_TYPES)}, all; default: all)')
+    parser.add_argument('--top-n', type=int,
+                       help='Number of top users to show in charts (default: 20 for the chart types named in '
+                            '--chart-type; with "all", each chart\'s own default)')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_CHART_DPI,
+                       help=f'Resolution of raster output (default: {DEFAULT_CHART_DPI})')
+    parser.add_argument('--format', choices=CHART_FORMATS, default='png',
+                       help='Image format; svg is vector and suits the bar charts (default: png)')
     
     args = parser.parse_args()
     
@@ -275,18 +424,28 @@ def main():
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     # チャートタイプに応じてグラフを作成
-    if args.chart_type == 'all':
-        create_all_charts(data, args.output_prefix)
-    elif args.chart_type == 'daily':
-        create_daily_contributions_chart(data, args.output_prefix)
-    elif args.chart_type == 'monthly':
-        create_monthly_contributions_chart(data, args.output_prefix)
-    elif args.chart_type == 'users':
-        create_user_comparison_chart(data, args.output_prefix, args.top_n)
-    elif args.chart_type == 'breakdown':
-        create_contribution_breakdown_chart(data, args.output_prefix, args.top_n)
-    elif args.chart_type == 'trend':
-        create_top_users_trend_chart(data, args.output_prefix, args.top_n)
+    if 'all' in args.chart_type:
+        create_all_charts(data, args.output_prefix, dpi=args.dpi, image_format=args.format, top_n=args.top_n)
+        return
+    
+    # 種類を指定した場合は、1種類でも複数でもtop_n未指定時は20人
+    top_n = args.top_n or 20
+    if len(args.chart_type) > 1:
+        create_all_charts(data, args.output_prefix, dpi=args.dpi, image_format=args.format, top_n=top_n,
+                          chart_types=args.chart_type)
+        return
+    
+    chart_type = args.chart_type[0]
+    if chart_type == 'daily':
+        create_daily_contributions_chart(data, args.output_prefix, dpi=args.dpi, image_format=args.format)
+    elif chart_type == 'monthly':
+        create_monthly_contributions_chart(data, args.output_prefix, dpi=args.dpi, image_format=args.format)
+    elif chart_type == 'users':
+        create_user_comparison_chart(data, args.output_prefix, dpi=args.dpi, image_format=args.format, top_n=top_n)
+    elif chart_type == 'breakdown':
+        create_contribution_breakdown_chart(data, args.output_prefix, dpi=args.dpi, image_format=args.format, top_n=top_n)
+    elif chart_type == 'trend':
+        create_top_users_trend_chart(data, args.output_prefix, dpi=args.dpi, image_format=args.format, top_n=top_n)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file